@@ -1,20 +1,33 @@
+import io  # import io library to build the printed output in memory
+import sys  # import sys library to write the output in one call
+
+import numpy as np  # import numpy library for fast array lookups
 import pandas as pd  # import pandas library for data manipulation and analysis
 
+try:  # compile the per-residue loops to native code when numba is installed
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:  # fall back to plain python otherwise
+    HAVE_NUMBA = False
+    def njit(*args, **kwargs):
+        return lambda func: func
+
 def pre_process(table_file, sequence_file):
     """
     This function reads in a CSV file containing scoring information for protein sequences,
-    as well as a text file containing a protein sequence. It returns the sequence, the scoring
-    information in the form of a pandas dataframe, and the length of the sequence.
+    as well as a text file containing a protein sequence. It returns the sequence, the sequence
+    encoded once as a uint8 array of ASCII codes, the scoring information in the form of a pandas
+    dataframe indexed by amino acid code, and the length of the sequence.
 
     Parameters:
     - table_file: (str) file name of the CSV file containing scoring information
     - sequence_file: (str) file name of the text file containing the protein sequence
     
     Returns:
-    - (tuple) sequence (str), pandas dataframe, N (int)
+    - (tuple) sequence (str), encoded sequence (numpy.ndarray), pandas dataframe, N (int)
     """
     try:  # attempt to read the csv file using pandas library
-        cf_table = pd.read_csv(table_file)
+        cf_table = pd.read_csv(table_file).set_index('code')
     except FileNotFoundError:  # handle file not found error
         print(f"Error: File '{table_file}' not found in the opened directory!")
         exit(1)  # exit the program with an error code of 1
@@ -27,201 +40,413 @@ def pre_process(table_file, sequence_file):
         exit(1)  # exit the program with an error code of 1
 
     N = len(seq)  # get the length of the sequence
+    seq_u8 = np.frombuffer(seq.encode('ascii'), dtype=np.uint8)  # view the sequence as raw bytes to index lookup tables with
 
-    return seq, cf_table, N  # return the sequence, the pandas dataframe, and the length of the sequence
+    return seq, seq_u8, cf_table, N  # return the sequence, its encoding, the pandas dataframe, and the length of the sequence
 
-def extension(struct, strt, stp, cf_table, X, who):
+def build_luts(cf_table):
     """
-    Extend a secondary structure window by four to the left and right to include a range of residues with a specific score.
+    Build lookup tables of helix and sheet propensities indexed by the ASCII code of each amino acid,
+    so that scoring a residue is a single array index instead of a pandas row filter.
 
     Parameters:
-    - struct (list): The secondary structure to be modified.
-    - strt (int): The starting index of the range to be modified.
-    - stp (int): The ending index (exclusive) of the range to be modified.
-    - cf_table (pandas.DataFrame): A table of contact frequencies for each amino acid pair.
-    - X (str): The character to be used for the extension (e.g. 'S' for sheet, 'H' for helix).
-    - who (str): The column in `cf_table` to use for scoring the residues ('Pa' for helix, 'Pb' for sheet).
+    - cf_table (pandas.DataFrame): The Chou-Fasman table indexed by amino acid 'code', with 'Pa' and 'Pb' columns.
 
     Returns:
-    The modified `struct` list.
+    - (tuple) Pa_lut (numpy.ndarray), Pb_lut (numpy.ndarray), both of length 128 and in integer hundredths,
+      and Pa_clip_lut (numpy.ndarray), Pb_clip_lut (numpy.ndarray), the uint8 window scores min(int(P), 1) of each amino acid
+    """
+    Pa_lut = np.zeros(128, dtype=np.int32)
+    Pb_lut = np.zeros_like(Pa_lut)
+    # store the propensities as integer hundredths, so that every sum of them is exact and
+    # compares against 4.00 (400) the same way whichever order it is added up in
+    codes = np.frombuffer(''.join(cf_table.index).encode('ascii'), dtype=np.uint8)
+    Pa_lut[codes] = np.rint(cf_table['Pa'].to_numpy(dtype=np.float64) * 100)
+    Pb_lut[codes] = np.rint(cf_table['Pb'].to_numpy(dtype=np.float64) * 100)
+    # bake the min(int(P), 1) clamp of the window scores into lookup tables of their own
+    Pa_clip_lut = (Pa_lut >= 100).astype(np.uint8)
+    Pb_clip_lut = (Pb_lut >= 100).astype(np.uint8)
+    return Pa_lut, Pb_lut, Pa_clip_lut, Pb_clip_lut
+
+def sliding_sum(vals, width):
     """
-    # Set the values in the range [strt, stp) which is either a 5 or 6 window of the `struct` list to `X` depending of helix of sheet
-    struct[strt:stp] = [X]*(stp - strt)
+    Sum every window of `width` consecutive values as the difference of two prefix sums,
+    rather than adding each window up from scratch.
 
-    # Initialize variables for scoring and string indices
-    lft_scr = 4
-    rgt_scr = 4
-    #scores intialised to 4 so that they can iterate inside the while loop given the condition, set to 0 right after loop starts
-    rgt_ptr = stp - 3
-    lft_ptr = strt + 3
+    Parameters:
+    - vals (numpy.ndarray): The uint8 values to be summed.
+    - width (int): The number of values in each window.
+
+    Returns:
+    - numpy.ndarray: The sum of the window starting at each index, of length len(vals) - width + 1
+    """
+    # accumulate in int32, the uint8 values would wrap around past 255
+    csum = np.concatenate(([0], np.cumsum(vals, dtype=np.int32)))
+    return csum[width:] - csum[:-width]
+
+def merge_hits(hits, width):
+    """
+    Merge qualifying windows that overlap or touch into single intervals, so that each stretch of
+    qualifying windows is extended once instead of once per window.
+
+    Parameters:
+    - hits (numpy.ndarray): The sorted starting indexes of the qualifying windows.
+    - width (int): The number of residues in each window.
+
+    Returns:
+    - (tuple) starts (numpy.ndarray), stops (numpy.ndarray) of the merged intervals, stops exclusive
+    """
+    if(len(hits) == 0):
+        return hits, hits
+    # a window starting more than `width` after the previous one leaves a gap and begins a new interval
+    breaks = np.where(np.diff(hits) > width)[0]
+    starts = hits[np.concatenate(([0], breaks + 1))]
+    stops = hits[np.concatenate((breaks, [len(hits) - 1]))] + width
+    return starts, stops
+
+@njit(cache=True)
+def extension_bounds(strt, stp, p_seq, N):
+    """
+    Find how far a secondary structure window extends by four to the left and right to include a range of residues with a specific score.
+    Every residue the extension reaches is next to one already reached, so the whole extended window is a single range.
+
+    Parameters:
+    - strt (int): The starting index of the window.
+    - stp (int): The ending index (exclusive) of the window.
+    - p_seq (numpy.ndarray): The propensity of each residue in hundredths to score them with (`Pa_seq` for helix, `Pb_seq` for sheet).
+    - N (int): The length of the protein sequence.
+
+    Returns:
+    - (tuple) lo (int), hi (int): the extended range [lo, hi)
+    """
+    lo = strt
 
     # Extend to the right until the score is less than 4 or the end of the sequence is reached
-    while(rgt_scr >= 4 and rgt_ptr + 4 < N ):
-        rgt_scr = 0
-        # Compute the score for the next 4 characters in the sequence
-        for j in seq[rgt_ptr:rgt_ptr + 4]:
-            rgt_scr += float(cf_table.loc[cf_table['code'] == j, who])
-        # If the score is greater than or equal to 4, set the next character in `struct` to `X`
-        if(rgt_scr >= 4):
-            struct[rgt_ptr + 3] = X
-        rgt_ptr += 1
+    rgt_ptr = stp - 3
+    if(rgt_ptr + 4 < N):
+        # Score the first 4 characters once, then slide the window by adding the entering and removing the leaving residue,
+        # the scores are integer hundredths so the running sum stays exactly equal to a fresh sum of the 4 characters
+        rgt_scr = p_seq[rgt_ptr] + p_seq[rgt_ptr + 1] + p_seq[rgt_ptr + 2] + p_seq[rgt_ptr + 3]
+        while(rgt_scr >= 400 and rgt_ptr + 4 < N):
+            # The score is greater than or equal to 4, the next character `rgt_ptr + 3` is included
+            rgt_ptr += 1
+            rgt_scr += p_seq[rgt_ptr + 3] - p_seq[rgt_ptr - 1]
 
     # Extend to the left until the score is less than 4 or the beginning of the sequence is reached
-    while(lft_scr >= 4 and lft_ptr - 4 > 0):
-        lft_scr = 0
-        # Compute the score for the previous 4 characters in the sequence
-        for j in seq[lft_ptr - 4:lft_ptr]:
-            lft_scr += float(cf_table.loc[cf_table['code'] == j, who])
-        # If the score is greater than or equal to 4, set the previous character in `struct` to `X`
-        if(lft_scr >= 4):
-            struct[lft_ptr - 4] = X
-        lft_ptr += 1
-
-    # Return the modified `struct` list
+    lft_ptr = strt + 3
+    if(lft_ptr - 4 > 0):
+        lft_scr = p_seq[lft_ptr - 4] + p_seq[lft_ptr - 3] + p_seq[lft_ptr - 2] + p_seq[lft_ptr - 1]
+        if(lft_scr >= 400):
+            lo = strt - 1
+        while(lft_scr >= 400):
+            # The score is greater than or equal to 4, the previous character `lft_ptr - 4` is included
+            lft_ptr += 1
+            # From `stp - 3` on, these are the windows the right extension scores, and it includes at least as much
+            # (also up to the end of the sequence), so stop here instead of walking the rest of the structure twice
+            if(lft_ptr > stp):
+                break
+            lft_scr += p_seq[lft_ptr - 1] - p_seq[lft_ptr - 5]
+
+    return lo, max(stp, rgt_ptr + 3, lft_ptr - 4)
+
+@njit(cache=True)
+def extension(struct, strt, stp, p_seq, X_ord, N):
+    """
+    Extend a secondary structure window by four to the left and right to include a range of residues with a specific score.
+
+    Parameters:
+    - struct (numpy.ndarray): The secondary structure to be modified, one ASCII byte per residue.
+    - strt (int): The starting index of the range to be modified.
+    - stp (int): The ending index (exclusive) of the range to be modified.
+    - p_seq (numpy.ndarray): The propensity of each residue in hundredths to score them with (`Pa_seq` for helix, `Pb_seq` for sheet).
+    - X_ord (int): The ASCII code of the character to be used for the extension (e.g. ord('S') for sheet, ord('H') for helix).
+    - N (int): The length of the protein sequence.
+
+    Returns:
+    The modified `struct` array.
+    """
+    # Set the extended range around the 5 or 6 window of the `struct` array to `X_ord` depending of helix of sheet
+    lo, hi = extension_bounds(strt, stp, p_seq, N)
+    struct[lo:hi] = X_ord
+
+    # Return the modified `struct` array
     return struct
 
-def alpha_chk(N, seq, cf_table,helix):
+def alpha_chk(N, Pa_seq, Pa_clip_seq,helix):
     '''
     This function checks for alpha helixes in a protein sequence and extends them if they meet the criteria.
     
     Arguments:
     - N (int): The length of the protein sequence
-    - seq (str): The protein sequence to be checked
-    - cf_table (pd.DataFrame): A Pandas DataFrame containing amino acid properties
-    - helix (list): A list representing the current state of the protein structure
+    - Pa_seq (np.ndarray): Helix propensity in hundredths of each residue of the protein sequence to be checked
+    - Pa_clip_seq (np.ndarray): Helix window score min(int(Pa), 1) of each residue
+    - helix (np.ndarray): A uint8 array representing the current state of the protein structure
     
     Returns:
     - str: A string representing the state of the protein structure after checking for and extending alpha helixes
     '''
-    strt = 0 # starting index of current six-letter subsequence
-    stp = 6 # ending index of current six-letter subsequence
-    while(stp <= N):
-        score = 0 # score of current six-letter subsequence
-        for i in seq[strt:stp]:
-            score += min(int(cf_table.loc[cf_table['code'] == i, 'Pa']),1) # adding score of each amino acid to the total score
-        if(score >=4): # if the score is greater than or equal to 4, extend the helix
-            extension(helix, strt, stp, cf_table, 'H', 'Pa')
-        # move to the next six-letter subsequence
-        strt += 1
-        stp += 1
-    return ''.join(helix) # return the final protein structure as a string
-
-
-def beta_chk(N, seq, cf_table,sheet):
+    # score every six-letter subsequence and keep the starting indexes of those scoring 4 or more
+    hits = np.where(sliding_sum(Pa_clip_seq, 6) >= 4)[0]
+    for strt, stp in zip(*merge_hits(hits, 6)): # extend the helix once from each stretch of qualifying subsequences
+        extension(helix, strt, stp, Pa_seq, ord('H'), N)
+    return helix.tobytes().decode('ascii') # return the final protein structure as a string
+
+
+def beta_chk(N, Pb_seq, Pb_clip_seq,sheet):
     """
     This function checks for the presence of beta sheets in the protein sequence and updates the sheet structure accordingly.
 
     Arguments:
     - N (int): The length of the protein sequence.
-    - seq (str): The protein sequence.
-    - cf_table (pd.DataFrame): A pandas dataframe containing the conformational free energies for each amino acid.
-    - sheet (List[str]): A list of characters representing the secondary structure of the protein. Each character can be either 'H' (for helix), 'S' (for sheet), or '_' (for no defined structure).
+    - Pb_seq (np.ndarray): Sheet propensity in hundredths of each residue of the protein sequence.
+    - Pb_clip_seq (np.ndarray): Sheet window score min(int(Pb), 1) of each residue.
+    - sheet (np.ndarray): A uint8 array of ASCII characters representing the secondary structure of the protein. Each character can be either 'H' (for helix), 'S' (for sheet), or '_' (for no defined structure).
 
     Returns:
     - str: The updated sheet structure of the protein.
     """
-    # Set the start and end positions for the sliding window
-    strt = 0
-    stp = 5
-    
-    # Slide the window along the protein sequence
-    while(stp <= N):
-        # Initialize the score to 0
-        score = 0
-        # Check the score for each amino acid in the window
-        for i in seq[strt:stp]:
-            # Add the minimum of the conformational free energy for beta sheets or 1
-            score += min(int(cf_table.loc[cf_table['code'] == i, 'Pb']),1)
-        # If the score meets the threshold, update the sheet structure
-        if(score >=3):
-            extension(sheet, strt, stp, cf_table, 'S', 'Pb')
-        # Slide the window by one position
-        strt += 1
-        stp += 1
-    
+    # Score every five-letter window and keep the starting indexes of those meeting the threshold
+    hits = np.where(sliding_sum(Pb_clip_seq, 5) >= 3)[0]
+
+    # Update the sheet structure once from each stretch of overlapping qualifying windows
+    for strt, stp in zip(*merge_hits(hits, 5)):
+        extension(sheet, strt, stp, Pb_seq, ord('S'), N)
+
     # Return the updated sheet structure
-    return ''.join(sheet)
+    return sheet.tobytes().decode('ascii')
 
-def conflict_resolution(N, seq,helix, sheet, cf_table, scnd_struct):
+def conflict_resolution(N, helix, sheet, cumPa, cumPb, scnd_struct):
     """
     Resolves conflicts between predicted secondary structures (helix or sheet) at each residue in a protein sequence.
 
     Arguments:
     - N (int): length of protein sequence
-    - seq (str): protein sequence
-    - helix (str): predicted helix secondary structure for each residue
-    - sheet (str): predicted sheet secondary structure for each residue
-    - cf_table (pandas DataFrame): table of amino acid pair conflict scores
-    - scnd_struct (str): list of secondary structure predictions after conflict resolution
+    - helix (numpy ndarray): predicted helix secondary structure for each residue, as uint8 ASCII codes
+    - sheet (numpy ndarray): predicted sheet secondary structure for each residue, as uint8 ASCII codes
+    - cumPa (numpy ndarray): prefix sums of the helix propensity of the residues, cumPa[i] summing the first i
+    - cumPb (numpy ndarray): prefix sums of the sheet propensity of the residues, cumPb[i] summing the first i
+    - scnd_struct (numpy ndarray): uint8 array to store the secondary structure predictions after conflict resolution
 
     Returns:
-    - scnd_struct (str): list of secondary structure predictions after conflict resolution
+    - scnd_struct (str): string of secondary structure predictions after conflict resolution
     """
+    # where there are no conflicts, assign the secondary structure predicted by helix or sheet
+    scnd_struct[:] = np.where(helix != ord('_'), helix, sheet)
+
+    # the residues predicted as both helix and sheet are in conflict
+    mask = (helix == ord('H')) & (sheet == ord('S'))
+
+    # the boundaries of every continuous string of conflicting structures are where the mask differs from itself shifted by one,
+    # alternating between the start and the (exclusive) end of each string
+    padded = np.concatenate(([False], mask, [False]))
+    bounds = np.flatnonzero(padded[1:] ^ padded[:-1])
+
+    starts = bounds[::2]
+    ends = bounds[1::2]
+
+    # calculate conflict scores for helix and sheet of every conflicting region at once from the prefix sums
+    score_a = cumPa[ends] - cumPa[starts]
+    score_b = cumPb[ends] - cumPb[starts]
 
+    # choose secondary structure with the lower conflict score for all residues in each conflicting region
+    choice = np.where(score_a < score_b, ord('S'), ord('H')).astype(np.uint8)
+    scnd_struct[mask] = np.repeat(choice, ends - starts)
+
+    return scnd_struct.tobytes().decode('ascii')
+
+@njit(cache=True)
+def predict_structure(Pa_seq, Pb_seq, Pa_clip_seq, Pb_clip_seq, N):
+    """
+    Predict helix and sheet regions and resolve their conflicts in one compiled kernel, keeping a single
+    packed structure byte per residue (bit 0 helix, bit 1 sheet) instead of separate helix and sheet arrays.
+
+    Arguments:
+    - Pa_seq (numpy ndarray): helix propensity of each residue in the sequence, in hundredths
+    - Pb_seq (numpy ndarray): sheet propensity of each residue in the sequence, in hundredths
+    - Pa_clip_seq (numpy ndarray): helix window score min(int(Pa), 1) of each residue in the sequence
+    - Pb_clip_seq (numpy ndarray): sheet window score min(int(Pb), 1) of each residue in the sequence
+    - N (int): length of protein sequence
+
+    Returns:
+    - scnd_struct (numpy ndarray): uint8 array of the secondary structure predictions after conflict resolution
+    """
+    structure = np.zeros(N, dtype=np.uint8)
+
+    # slide the six-letter helix window and the five-letter sheet window together, extending each stretch of
+    # overlapping qualifying windows once it is complete; a stop of -1 means no stretch is open
+    pa_win = 0
+    pb_win = 0
+    helix_strt = helix_stp = -1
+    sheet_strt = sheet_stp = -1
+    for i in range(N):
+        pa_win += Pa_clip_seq[i]
+        pb_win += Pb_clip_seq[i]
+        if(i >= 6):
+            pa_win -= Pa_clip_seq[i - 6]
+        if(i >= 5):
+            pb_win -= Pb_clip_seq[i - 5]
+
+        if(i >= 5 and pa_win >= 4):
+            if(i - 5 > helix_stp):
+                if(helix_stp >= 0):
+                    lo, hi = extension_bounds(helix_strt, helix_stp, Pa_seq, N)
+                    structure[lo:hi] |= np.uint8(1)
+                helix_strt = i - 5
+            helix_stp = i + 1
+
+        if(i >= 4 and pb_win >= 3):
+            if(i - 4 > sheet_stp):
+                if(sheet_stp >= 0):
+                    lo, hi = extension_bounds(sheet_strt, sheet_stp, Pb_seq, N)
+                    structure[lo:hi] |= np.uint8(2)
+                sheet_strt = i - 4
+            sheet_stp = i + 1
+
+    if(helix_stp >= 0):
+        lo, hi = extension_bounds(helix_strt, helix_stp, Pa_seq, N)
+        structure[lo:hi] |= np.uint8(1)
+    if(sheet_stp >= 0):
+        lo, hi = extension_bounds(sheet_strt, sheet_stp, Pb_seq, N)
+        structure[lo:hi] |= np.uint8(2)
+
+    # extensions reach back before the window that triggered them, so conflicts are resolved once every residue is marked
+    scnd_struct = np.empty(N, dtype=np.uint8)
     i = 0
     while(i < N):
-        #store the starting value in case i shifted due to constinuous string of conflicting structures
-        j = i
-        score_a = 0
-        score_b = 0
-        while(i < N and helix[i] == 'H' and sheet[i] == 'S'):
-            # calculate conflict scores for helix and sheet
-            score_a += float(cf_table.loc[cf_table['code'] == seq[i], 'Pa'])
-            score_b += float(cf_table.loc[cf_table['code'] == seq[i], 'Pb'])
+        if(structure[i] == 3):
+            # calculate conflict scores for helix and sheet over the continuous string of conflicting structures,
+            # as exact sums of the integer hundredths so that ties resolve to helix like on the vectorized path
+            j = i
+            score_a = 0
+            score_b = 0
+            while(i < N and structure[i] == 3):
+                score_a += Pa_seq[i]
+                score_b += Pb_seq[i]
+                i += 1
+            # choose secondary structure with the lower conflict score
+            scnd_struct[j:i] = ord('S') if score_a < score_b else ord('H')
+        else:
+            # if there are no conflicts, assign the secondary structure predicted by helix or sheet
+            scnd_struct[i] = ord('H') if structure[i] & 1 else (ord('S') if structure[i] & 2 else ord('_'))
             i += 1
 
-        # choose secondary structure with the lower conflict score
-        cnflct = 'S' if score_a < score_b else 'H'
+    return scnd_struct
 
-        # assign the chosen secondary structure to all residues in the conflicting region
-        for f in range(j,i):
-            scnd_struct[f] = cnflct
 
-        # if there are no conflicts, assign the secondary structure predicted by helix or sheet
-        if(i < N):
-            scnd_struct[i] = 'H' if helix[i] != '_' else ('S' if sheet[i] != '_' else '_')
-            i += 1
+def predict_structure_vectorized(Pa_seq, Pb_seq, Pa_clip_seq, Pb_clip_seq, N):
+    """
+    Predict helix and sheet regions and resolve their conflicts with the vectorized checks run one after another,
+    for when numba is not installed and a per-residue kernel would run as plain python.
+
+    Arguments:
+    - Pa_seq (numpy ndarray): helix propensity of each residue in the sequence, in hundredths
+    - Pb_seq (numpy ndarray): sheet propensity of each residue in the sequence, in hundredths
+    - Pa_clip_seq (numpy ndarray): helix window score min(int(Pa), 1) of each residue in the sequence
+    - Pb_clip_seq (numpy ndarray): sheet window score min(int(Pb), 1) of each residue in the sequence
+    - N (int): length of protein sequence
+
+    Returns:
+    - scnd_struct (numpy ndarray): uint8 array of the secondary structure predictions after conflict resolution
+    """
+    # Take the prefix sums of the helix and sheet propensities for conflict resolution, as exact int64 sums of
+    # the hundredths so that the conflict scores compare the same way as in `predict_structure`
+    cumPa = np.concatenate(([0], np.cumsum(Pa_seq, dtype=np.int64)))
+    cumPb = np.concatenate(([0], np.cumsum(Pb_seq, dtype=np.int64)))
 
-    return ''.join(scnd_struct)
+    # Create empty uint8 arrays of length N to store predicted secondary structure using the alpha and beta check methods
+    predict_a = np.full(N, ord('_'), dtype=np.uint8)
+    predict_b = np.full(N, ord('_'), dtype=np.uint8)
 
+    # Create an empty uint8 array of length N to store the final predicted secondary structure
+    predict = np.full(N, ord('_'), dtype=np.uint8)
 
-# Main Code
+    # Use the alpha check method to predict helical regions and store the predictions in predict_a
+    alpha_chk(N,Pa_seq,Pa_clip_seq,predict_a)
 
-# Call the pre_process function to read in the Chou-Fasman table and protein sequence from files
-seq, cf_table, N = pre_process("ChouFas.csv", 'Protein_seq.txt')
+    # Use the beta check method to predict sheet regions and store the predictions in predict_b
+    beta_chk(N,Pb_seq,Pb_clip_seq,predict_b)
 
-# Create empty lists of length N to store predicted secondary structure using the alpha and beta check methods
-predict_a =['_']*N
-predict_b =['_']*N
+    # Use the conflict resolution method to combine the predictions from predict_a and predict_b and store the final predictions in predict
+    conflict_resolution(N, predict_a, predict_b, cumPa, cumPb, predict)
 
-# Create an empty list of length N to store the final predicted secondary structure
-predict = ['_']*N
+    return predict
 
+@njit(cache=True)
+def predict_structure_batch(Pa_seq, Pb_seq, Pa_clip_seq, Pb_clip_seq, offsets):
+    """
+    Run the compiled prediction over many protein sequences concatenated into one buffer, in a single call.
 
+    Arguments:
+    - Pa_seq, Pb_seq, Pa_clip_seq, Pb_clip_seq (numpy ndarray): the per-residue arrays of `predict_structure`, for all sequences back to back
+    - offsets (numpy ndarray): start of each sequence in the buffer, followed by the total length
 
-# Use the alpha check method to predict helical regions and store the predictions in predict_a
-alpha_chk(N,seq,cf_table,predict_a)
+    Returns:
+    - scnd_struct (numpy ndarray): uint8 array of the secondary structure predictions of all sequences back to back
+    """
+    scnd_struct = np.empty(len(Pa_seq), dtype=np.uint8)
+    for k in range(len(offsets) - 1):
+        # every sequence is predicted on its own slice, so no window or extension runs across into its neighbour
+        a = offsets[k]
+        b = offsets[k + 1]
+        scnd_struct[a:b] = predict_structure(Pa_seq[a:b], Pb_seq[a:b], Pa_clip_seq[a:b], Pb_clip_seq[a:b], b - a)
+    return scnd_struct
+
+def predict_batch(seqs, cf_table):
+    """
+    Predict the secondary structure of many protein sequences, building the lookup tables once for all of them
+    and running the prediction over a single concatenated buffer.
 
-# Use the beta check method to predict sheet regions and store the predictions in predict_b
-beta_chk(N,seq,cf_table,predict_b)
+    Arguments:
+    - seqs (list of numpy ndarray): the protein sequences, each a uint8 array of ASCII codes as returned by `pre_process`
+    - cf_table (pandas DataFrame): the Chou-Fasman table as returned by `pre_process`
 
-# Use the conflict resolution method to combine the predictions from predict_a and predict_b and store the final predictions in predict
-conflict_resolution(N, seq, predict_a, predict_b, cf_table, predict)
+    Returns:
+    - list of numpy ndarray: uint8 array of the secondary structure predictions of each sequence
+    """
+    # Build the propensity lookup tables once
+    Pa_lut, Pb_lut, Pa_clip_lut, Pb_clip_lut = build_luts(cf_table)
 
-# Print the protein sequence in a easily viewable 50 string sliced output
-i = 0
-while(i<N):
-    print()
-    end = min(i+50, N)
-    info_str = str(i)+':'+str(end)
-    spces = ' '*(20-len(info_str))
-    info_str += spces
-    print(info_str, end = '')
-    for j in range(i, end):
-        print(seq[j],end = '')
-    print(end = "\n"+' '*20)
-    for j in range(i, end):
-        print(predict[j],end = '')
-    i+=50
-    print()
-print()
+    # Concatenate the sequences into one buffer, sequence k spanning offsets[k]:offsets[k + 1]
+    offsets = np.concatenate(([0], np.cumsum([len(seq_u8) for seq_u8 in seqs]))).astype(np.int64)
+    seq_u8 = np.concatenate(seqs) if len(seqs) > 0 else np.zeros(0, dtype=np.uint8)
+
+    # Look up the helix and sheet propensity and window score of every residue once, shared by every phase
+    Pa_seq = Pa_lut[seq_u8]
+    Pb_seq = Pb_lut[seq_u8]
+    Pa_clip_seq = Pa_clip_lut[seq_u8]
+    Pb_clip_seq = Pb_clip_lut[seq_u8]
+
+    if(HAVE_NUMBA):
+        # Predict helical and sheet regions and resolve their conflicts for every sequence in a single compiled call
+        predict = predict_structure_batch(Pa_seq, Pb_seq, Pa_clip_seq, Pb_clip_seq, offsets)
+    else:
+        predict = np.empty(len(seq_u8), dtype=np.uint8)
+        for k in range(len(seqs)):
+            a, b = offsets[k], offsets[k + 1]
+            predict[a:b] = predict_structure_vectorized(Pa_seq[a:b], Pb_seq[a:b], Pa_clip_seq[a:b], Pb_clip_seq[a:b], b - a)
+
+    # Split the predictions back up by sequence
+    return [predict[offsets[k]:offsets[k + 1]] for k in range(len(seqs))]
+
+
+# Main Code
+
+if __name__ == '__main__':
+    # Call the pre_process function to read in the Chou-Fasman table and protein sequence from files
+    seq, seq_u8, cf_table, N = pre_process("ChouFas.csv", 'Protein_seq.txt')
+
+    # Predict the secondary structure of the sequence, as a batch of one
+    predict = predict_batch([seq_u8], cf_table)[0]
+
+    # Print the protein sequence in a easily viewable 50 string sliced output, built up in memory and written out at once
+    out = io.StringIO()
+    i = 0
+    while(i<N):
+        end = min(i+50, N)
+        info_str = str(i)+':'+str(end)
+        spces = ' '*(20-len(info_str))
+        info_str += spces
+        out.write('\n' + info_str + seq[i:end] + '\n' + ' '*20 + predict[i:end].tobytes().decode('ascii') + '\n')
+        i+=50
+    out.write('\n')
+    sys.stdout.write(out.getvalue())
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+import chou_fasman as cf
+
+
+def load_luts():
+    return cf.build_luts(pd.read_csv("ChouFas.csv").set_index('code'))
+
+def random_seq(rng, N):
+    codes = np.frombuffer(''.join(pd.read_csv("ChouFas.csv")['code']).encode('ascii'), dtype=np.uint8)
+    return rng.choice(codes, N)
+
+def reference_extension(strt, stp, p_seq, N):
+    """
+    Extend a window the way the original `extension` does, scoring every 4 characters from scratch.
+    """
+    struct = np.zeros(N, dtype=bool)
+    struct[strt:stp] = True
+    rgt_ptr = stp - 3
+    while(rgt_ptr + 4 < N and p_seq[rgt_ptr:rgt_ptr + 4].sum() >= 400):
+        struct[rgt_ptr + 3] = True
+        rgt_ptr += 1
+    lft_ptr = strt + 3
+    while(lft_ptr - 4 > 0 and p_seq[lft_ptr - 4:lft_ptr].sum() >= 400):
+        struct[lft_ptr - 4] = True
+        lft_ptr += 1
+    return struct
+
+def test_extension_bounds_matches_fresh_sums():
+    rng = np.random.default_rng(0)
+    Pa_lut, Pb_lut, _, _ = load_luts()
+    for _ in range(2000):
+        N = int(rng.integers(6, 60))
+        seq_u8 = random_seq(rng, N)
+        p_seq = (Pa_lut if rng.integers(2) else Pb_lut)[seq_u8]
+        strt = int(rng.integers(0, N - 5))
+        stp = int(rng.integers(strt + 5, min(strt + 12, N) + 1))
+        lo, hi = cf.extension_bounds(strt, stp, p_seq, N)
+        struct = np.zeros(N, dtype=bool)
+        struct[lo:hi] = True
+        assert (struct == reference_extension(strt, stp, p_seq, N)).all()
+
+def test_kernel_matches_vectorized():
+    rng = np.random.default_rng(1)
+    Pa_lut, Pb_lut, Pa_clip_lut, Pb_clip_lut = load_luts()
+    seqs = [random_seq(rng, int(rng.integers(0, 300))) for _ in range(2000)]
+    seqs.append(np.frombuffer(b'IPKFMEQG', dtype=np.uint8))  # Pa and Pb of the conflict both sum to 8.21
+    for seq_u8 in seqs:
+        args = (Pa_lut[seq_u8], Pb_lut[seq_u8], Pa_clip_lut[seq_u8], Pb_clip_lut[seq_u8], len(seq_u8))
+        assert cf.predict_structure(*args).tobytes() == cf.predict_structure_vectorized(*args).tobytes()